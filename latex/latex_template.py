@@ -1,5 +1,19 @@
 import math
-from pathlib import Path
+import os
+from functools import lru_cache
+from pathlib import Path, PurePath
+
+
+@lru_cache(maxsize=8192)
+def _escape(text):
+    """Escapes underscores for LaTeX."""
+    return text.replace("_", "\\_")
+
+
+@lru_cache(maxsize=8192)
+def _escape_stem(path):
+    """Returns the escaped stem of a path given as string."""
+    return _escape(PurePath(path).stem)
 
 
 class LatexTemplate:
@@ -53,7 +67,7 @@ class LatexTemplate:
         new_dict = {}
         for k, v in original_dict.items():
             if k in name_dict or include_unspecified:
-                new_key = name_dict.get(k, k).replace("_", "\\_")
+                new_key = _escape(name_dict.get(k, k))
                 new_dict[new_key] = v
         return new_dict
 
@@ -73,10 +87,8 @@ class LatexTemplate:
         Generates LaTeX code for including a list of images in minipages.
         """
         return "\n".join(
-            [
-                self._generate_minipage_for_image(image_file, index)
-                for index, image_file in enumerate(image_files, start=1)
-            ]
+            self._generate_minipage_for_image(image_file, index)
+            for index, image_file in enumerate(image_files, start=1)
         )
 
     def _generate_image_figure(self, image_files, caption, label=""):
@@ -125,6 +137,10 @@ class LatexTemplate:
         if num == 0:
             return "$0$"
 
+        # inf and nan have no exponent or magnitude to round to
+        if not math.isfinite(num):
+            return f"${num}$"
+
         # Apply scientific notation for very small or very large numbers
         if abs(num) < 1e-3 or abs(num) > 1e6:
             exponent = int(f"{num:e}".split("e")[-1])
@@ -162,23 +178,19 @@ class LatexTemplate:
     def _convert_paths_to_stem(self, dictionary):
         for key, value in dictionary.items():
             if isinstance(value, Path):
-                stem = value.stem
+                path = str(value)
             elif isinstance(value, str):
-                try:
-                    path = Path(value)
-                    if (
-                        path.exists() or path.is_absolute()
-                    ):  # Check if it's a valid path
-                        stem = path.stem
-                    else:
-                        continue  # If it's not a valid path, skip to next item
-                except Exception:
-                    continue  # If it's not a valid path, skip to the next item
+                # Only strings containing a path separator are treated as
+                # paths, there is no need to hit the filesystem for that
+                if os.sep in value or "/" in value:
+                    path = value
+                else:
+                    continue  # If it's not a valid path, skip to next item
             else:
                 continue  # If it's not a path, skip to the next item
 
             # Replace underscores with escaped underscores for LaTeX
-            dictionary[key] = stem.replace("_", "\\_")
+            dictionary[key] = _escape_stem(path)
 
         return dictionary
 
@@ -196,7 +208,7 @@ class LatexTemplate:
         Fills a LaTeX template with metrics, hyperparameters, and images.
         """
         esc_section_name = (
-            str(section_name).replace("_", "\\_") if section_name else None
+            _escape(str(section_name)) if section_name else None
         )
         section = (
             f"\n\n\\section{{{esc_section_name}}}\n\n"
@@ -230,23 +242,19 @@ class LatexTemplate:
         metrics = dict(sorted(metrics.items()))
         hyperparameters = dict(sorted(hyperparameters.items()))
 
-        # Categorize and process images
-        metric_image_files = [
-            image
-            for image in image_files
-            if any(image.stem in metric for metric in metric_names.keys())
-        ]
-        optuna_images = [
-            image
-            for image in image_files
-            if "param_importance" in image.stem
-            or "optimization_history" in image.stem
-        ]
-        other_images = [
-            image
-            for image in image_files
-            if image not in optuna_images + metric_image_files
-        ]
+        # Categorize and process images, each image ends up in one category
+        metric_keys = tuple(metric_names)
+        metric_image_files = []
+        optuna_images = []
+        other_images = []
+        for image in image_files:
+            stem = image.stem
+            if any(stem in metric for metric in metric_keys):
+                metric_image_files.append(image)
+            elif "param_importance" in stem or "optimization_history" in stem:
+                optuna_images.append(image)
+            else:
+                other_images.append(image)
 
         # Create figures for images
         optuna_images_figure = (
@@ -0,0 +1,33 @@
+import yaml
+
+try:
+    # libyaml based loader and dumper, much faster than the pure Python ones
+    from yaml import CSafeDumper as SafeDumper
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeDumper, SafeLoader
+
+__all__ = ["SafeDumper", "SafeLoader", "generic_unknown_tag_handler"]
+
+
+def generic_unknown_tag_handler(loader, tag_suffix, node):
+    # Prepare a string representation of the node value
+    if isinstance(node, yaml.ScalarNode):
+        value = loader.construct_scalar(node)
+    elif isinstance(node, yaml.SequenceNode):
+        value = loader.construct_sequence(node)
+    elif isinstance(node, yaml.MappingNode):
+        value = loader.construct_mapping(node)
+    else:
+        value = None  # A default for unrecognized node types
+    # Return a string that includes the tag and the value
+    return f"!!{tag_suffix} {value}"
+
+
+# Register the generic handler for all unknown tags, only once per process
+if not getattr(yaml, "_tag_handler_installed", False):
+    for loader in {yaml.SafeLoader, SafeLoader}:
+        yaml.add_multi_constructor(
+            "", generic_unknown_tag_handler, Loader=loader
+        )
+    yaml._tag_handler_installed = True
@@ -1,12 +1,89 @@
+import mmap
+import os
+import struct
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 
 import pandas as pd
-import tensorflow as tf
-import tensorflow
+from tensorboard.compat.proto.event_pb2 import Event
 from tqdm import tqdm
 
 from .model_search_base import ModelSearchBase
 
+# TFRecord framing: uint64 length, uint32 length crc, payload, uint32 data crc
+_RECORD_LENGTH = struct.Struct("<Q")
+_RECORD_HEADER_SIZE = 12
+_RECORD_FOOTER_SIZE = 4
+
+
+def _iter_event_records(event_file_path, tokens):
+    """
+    Yields the serialized records of an event file that contain at least one
+    of the given byte tokens. The file is memory mapped and records without a
+    token are skipped without being copied or parsed. The checksums are not
+    verified.
+    """
+    with open(event_file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            size = len(mm)
+            offset = 0
+            while offset + _RECORD_HEADER_SIZE <= size:
+                (length,) = _RECORD_LENGTH.unpack_from(mm, offset)
+                start = offset + _RECORD_HEADER_SIZE
+                end = start + length
+                if end + _RECORD_FOOTER_SIZE > size:
+                    break  # truncated record, e.g. the file is still written
+                if any(mm.find(token, start, end) != -1 for token in tokens):
+                    yield mm[start:end]
+                offset = end + _RECORD_FOOTER_SIZE
+
+
+def _create_wide_dataframe(steps, tags, values, tag_order):
+    """
+    Builds a (step x tag) dataframe from the scalars of an event file. The
+    last value logged for a step and tag wins.
+    """
+    if not steps:
+        return pd.DataFrame()
+
+    df = pd.DataFrame({"step": steps, "tag": tags, "value": values})
+    # pivot keeps NaN values, unlike pivot_table which would skip them when
+    # aggregating and drop steps that only logged NaN
+    df = df.drop_duplicates(["step", "tag"], keep="last").pivot(
+        index="step", columns="tag", values="value"
+    )
+    # keep the tags in the order they were first logged
+    df = df.reindex(columns=tag_order)
+    df = df.rename_axis(index=None, columns=None)
+
+    return df
+
+
+def _process_log_dir(log_dir, split):
+    """
+    Creates the dataframe of all tfevents files in the version directories of
+    one log directory. Defined at module level so that it can be dispatched to
+    worker processes.
+    """
+    # collect the frames first and concatenate them once at the end
+    frames = []
+    for version_dir in ModelAnalysis._get_version_dirs(log_dir):
+        tf_events_files = ModelAnalysis._get_tf_events_files(version_dir)
+        for tfevent in tf_events_files:
+            new_df = ModelAnalysis.extract_data_from_event_file(
+                str(tfevent),
+                split=split,
+            )
+            new_df["version"] = version_dir.name
+            frames.append(new_df)
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    return {"log_dir": log_dir, "dataframe": df}
+
 
 class ModelAnalysis(ModelSearchBase):
     def __init__(
@@ -19,51 +96,99 @@ class ModelAnalysis(ModelSearchBase):
 
         self.data = self.create_dataframe()
 
-    def _get_tf_events_files(self, version_dir):
+    @staticmethod
+    def _get_tf_events_files(version_dir):
         tf_events_files = []
         for tfevent in version_dir.glob("*tfevents*"):
             tf_events_files.append(tfevent)
 
         return tf_events_files
 
-    def extract_data_from_event_file(
-        self,
-        event_file_path,
-        split,
-        exclude="step",
-    ):
-        df = pd.DataFrame()
+    @staticmethod
+    def _extract_splits_from_event_file(event_file_path, splits, exclude):
+        """
+        Extracts the scalars of several splits from an event file in a single
+        pass. Returns one dataframe per split, in the order of splits.
+        """
+        columns = {split: ([], [], []) for split in splits}
+
+        # Cache the splits each tag belongs to, the same few tags recur in
+        # every record
+        tag_splits = {}
+
+        # The tags are stored verbatim in the serialized records, so records
+        # that don't contain any of the splits can be skipped before parsing
+        split_bytes = [split.encode() for split in splits]
 
         try:
             # Iterate through the records in one event file
-            for e in tf.compat.v1.train.summary_iterator(event_file_path):
+            for raw in _iter_event_records(event_file_path, split_bytes):
+                e = Event.FromString(raw)
                 for v in e.summary.value:
-                    if v.HasField("simple_value"):
-                        if split in v.tag and exclude not in v.tag:
-                            df.loc[e.step, v.tag] = v.simple_value
+                    if not v.HasField("simple_value"):
+                        continue
+                    # intern the tag so that the tag lists only reference a
+                    # handful of shared strings
+                    tag = sys.intern(v.tag)
+                    matches = tag_splits.get(tag)
+                    if matches is None:
+                        matches = [
+                            split
+                            for split in splits
+                            if split in tag and exclude not in tag
+                        ]
+                        tag_splits[tag] = matches
+                    for split in matches:
+                        steps, tags, values = columns[split]
+                        steps.append(e.step)
+                        tags.append(tag)
+                        values.append(v.simple_value)
         except Exception as e:
             print(f"{e}: {event_file_path}. Skipping file.")
 
+        return [
+            _create_wide_dataframe(
+                *columns[split],
+                tag_order=[tag for tag, m in tag_splits.items() if split in m],
+            )
+            for split in splits
+        ]
+
+    @staticmethod
+    def extract_data_from_event_file(
+        event_file_path,
+        split,
+        exclude="step",
+    ):
+        (df,) = ModelAnalysis._extract_splits_from_event_file(
+            event_file_path, (split,), exclude
+        )
         return df
 
+    @staticmethod
+    def _extract_train_val(event_file_path, exclude="epoch"):
+        """
+        Returns the train and val dataframes of an event file, parsing the
+        file only once.
+        """
+        train_df, val_df = ModelAnalysis._extract_splits_from_event_file(
+            event_file_path, ("train", "val"), exclude
+        )
+        return train_df, val_df
+
     def create_dataframe(self):
-        dataframes = []
-        pbar = tqdm(self.log_dirs)
-        for log_dir in pbar:
-            pbar.set_description(
-                f"Creating dataframes .../{log_dir.relative_to(self.start_path)}"  # noqa
+        # Parsing the tfevents files is CPU bound and independent per log
+        # directory, so the log directories are processed in parallel
+        with ProcessPoolExecutor() as executor:
+            dataframes = list(
+                tqdm(
+                    executor.map(
+                        partial(_process_log_dir, split=self.split),
+                        self.log_dirs,
+                    ),
+                    total=len(self.log_dirs),
+                    desc="Creating dataframes",
+                )
             )
-            df = pd.DataFrame()
-            for version_dir in self._get_version_dirs(log_dir):
-                tf_events_files = self._get_tf_events_files(version_dir)
-                for tfevent in tf_events_files:
-                    new_df = self.extract_data_from_event_file(
-                        str(tfevent),
-                        split=self.split,
-                    )
-                    new_df["version"] = version_dir.name
-                    df = pd.concat([df, new_df])
-            df.reset_index(drop=True, inplace=True)
-            dataframes.append({"log_dir": log_dir, "dataframe": df})
 
         return dataframes
@@ -1,8 +1,77 @@
+import re
+import numpy as np
 from .model_analysis import ModelAnalysis
 from pathlib import Path
 from tqdm import tqdm
 
 
+def _compile_metric_pattern(metrics):
+    """Compile a regex matching any of the given metric names as substring."""
+    return re.compile("|".join(re.escape(metric) for metric in metrics))
+
+
+def _sort_by_priority(columns, priorities):
+    """
+    Moves the columns containing a priority metric to the front. Each priority
+    metric in turn moves its matching columns to the front in reversed order,
+    so the last listed priority metric ends up as the primary sort key. This
+    is the order the former in-place remove/insert(0) loops produced, built
+    with one list pass per priority metric.
+    """
+    for priority_metric in priorities:
+        matched = [col for col in columns if priority_metric in col]
+        if matched:
+            columns = matched[::-1] + [
+                col for col in columns if priority_metric not in col
+            ]
+
+    return columns
+
+
+def _select_metric_columns(df, metric_re):
+    """
+    Drops all columns of the dataframe that don't match the metric pattern,
+    except the version column.
+    """
+    # first check if the dataframe is not empty
+    if df.shape[0] == 0 or df.shape[1] == 0:
+        return df
+
+    # drop any columns where a metric is not in the name of the column
+    # except the version column
+    df = df.drop(
+        columns=[
+            col
+            for col in df.columns
+            if col != "version" and not metric_re.search(col)
+        ]
+    )
+
+    return df
+
+
+def _lexsort_dataframe(df, by, ascending):
+    """
+    Sorts the dataframe by the numeric columns in by with a single np.lexsort
+    and resets the index. Like DataFrame.sort_values, NaNs are placed last
+    regardless of the sort direction.
+    """
+    if not by:
+        return df.reset_index(drop=True)
+
+    keys = []
+    for col, asc in zip(by, ascending):
+        values = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        if not asc:
+            values = -values
+        keys.append(np.where(np.isnan(values), np.inf, values))
+
+    # np.lexsort uses the last key as the primary one
+    order = np.lexsort(keys[::-1])
+
+    return df.iloc[order].reset_index(drop=True)
+
+
 class ModelEvaluation(ModelAnalysis):
     def __init__(
         self,
@@ -47,47 +116,62 @@ class ModelEvaluation(ModelAnalysis):
                     "Custom_metrics values must be either 'min' or 'max'."
                 )
 
-        self.data = self._create_sorted_metrics_dataframe()
-
-    def _extract_metrics_from_dataframe(self, df):
-        """Extract metrics from dataframe and add them to the dataframe."""
-
-        # first check if the dataframe is not empty
-        if df.empty:
-            return df
+        # Priority metrics are always sorted in their given direction
+        for prio in self.priority_min:
+            if prio not in self.min_metrics:
+                self.min_metrics.append(prio)
+        for prio in self.priority_max:
+            if prio not in self.max_metrics:
+                self.max_metrics.append(prio)
 
-        # drop any columns where a metric is not in the name of the column
-        # except the version column
-        all_metrics = (
+        # Precompile the metric patterns used to classify the columns
+        self._metric_re = _compile_metric_pattern(
             self.min_metrics
             + self.max_metrics
-            + self.priority_min
-            + self.priority_max
             + list(self.custom_metrics.keys())
         )
-        df = df.drop(
-            columns=[
-                col
-                for col in df.columns
-                if not any(metric in col for metric in all_metrics)
-                and col != "version"
-            ]
-        )
+        self._min_re = _compile_metric_pattern(self.min_metrics)
+        self._max_re = _compile_metric_pattern(self.max_metrics)
+        self._column_buckets = {}
+        self._sort_cols_cache = {}
 
-        return df
+        self.data = self._create_sorted_metrics_dataframe()
 
-    def _sort_metrics_dataframe(
-        self,
-        df,
-    ):
-        df = self._extract_metrics_from_dataframe(df)
+    def _extract_metrics_from_dataframe(self, df):
+        """Extract metrics from dataframe and add them to the dataframe."""
 
-        for prio in self.priority_min:
-            if prio not in self.min_metrics:
-                self.min_metrics.append(prio)
-        for prio in self.priority_max:
-            if prio not in self.max_metrics:
-                self.max_metrics.append(prio)
+        return _select_metric_columns(df, self._metric_re)
+
+    def _classify_column(self, col):
+        """
+        Returns "min" or "max" if the column is a metric to be minimized or
+        maximized and None otherwise. The result is cached per column name,
+        as the same columns show up in most log directories.
+        """
+        try:
+            return self._column_buckets[col]
+        except KeyError:
+            pass
+
+        if self._min_re.search(col):
+            bucket = "min"
+        elif self._max_re.search(col):
+            bucket = "max"
+        else:
+            bucket = None
+
+        self._column_buckets[col] = bucket
+        return bucket
+
+    def _get_sort_columns(self, columns):
+        """
+        Classify the columns into columns to be minimized and columns to be
+        maximized. The result is cached per tuple of columns since most log
+        directories share the same columns.
+        """
+        key = tuple(columns)
+        if key in self._sort_cols_cache:
+            return self._sort_cols_cache[key]
 
         # Initialize empty lists to hold column names for sorting
         sort_cols_min = []
@@ -95,12 +179,28 @@ class ModelEvaluation(ModelAnalysis):
 
         # Classify each column based on whether it should be minimized or
         # maximized
-        for col in df.columns:
-            if any(min_metric in col for min_metric in self.min_metrics):
+        for col in columns:
+            bucket = self._classify_column(col)
+            if bucket == "min":
                 sort_cols_min.append(col)
-            elif any(max_metric in col for max_metric in self.max_metrics):
+            elif bucket == "max":
                 sort_cols_max.append(col)
 
+        # Add any priority metrics to the beginning of the sort lists
+        sort_cols_min = _sort_by_priority(sort_cols_min, self.priority_min)
+        sort_cols_max = _sort_by_priority(sort_cols_max, self.priority_max)
+
+        self._sort_cols_cache[key] = (sort_cols_min, sort_cols_max)
+        return sort_cols_min, sort_cols_max
+
+    def _sort_metrics_dataframe(
+        self,
+        df,
+    ):
+        df = self._extract_metrics_from_dataframe(df)
+
+        sort_cols_min, sort_cols_max = self._get_sort_columns(df.columns)
+
         if sort_cols_min == [] and sort_cols_max == []:
             pass
             # print(
@@ -111,37 +211,20 @@ class ModelEvaluation(ModelAnalysis):
             #     "The log directory may also be empty."
             # )
 
-        # Add any priority metrics to the beginning of the sort lists
-        for priority_metric in self.priority_min:
-            # if the priority metric is in the name of a column, remove it from
-            # the list and add it to the beginning of the list
-            for col in sort_cols_min:
-                if priority_metric in col:
-                    sort_cols_min.remove(col)
-                    sort_cols_min.insert(0, col)
-
-        for priority_metric in self.priority_max:
-            # if the priority metric is in the name of a column, remove it from
-            # the list and add it to the beginning of the list
-            for col in sort_cols_max:
-                if priority_metric in col:
-                    sort_cols_max.remove(col)
-                    sort_cols_max.insert(0, col)
-
         # Adjust sorting logic based on priority_order
         if self.priority_order == "minimize":
-            sorted_metrics_df = df.sort_values(
+            sorted_metrics_df = _lexsort_dataframe(
+                df,
                 by=sort_cols_min + sort_cols_max,
                 ascending=[True] * len(sort_cols_min)
                 + [False] * len(sort_cols_max),
-                ignore_index=True,
             )
         elif self.priority_order == "maximize":
-            sorted_metrics_df = df.sort_values(
+            sorted_metrics_df = _lexsort_dataframe(
+                df,
                 by=sort_cols_max + sort_cols_min,
                 ascending=[False] * len(sort_cols_max)
                 + [True] * len(sort_cols_min),
-                ignore_index=True,
             )
         else:
             raise ValueError(
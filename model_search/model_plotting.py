@@ -1,7 +1,10 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
-import matplotlib.pyplot as plt
 import seaborn as sns
+from matplotlib.figure import Figure
+from .model_analysis import ModelAnalysis
+from .model_evaluation import _select_metric_columns
 from .model_selection import ModelSelection
 from tqdm import tqdm
 
@@ -9,6 +12,28 @@ sns.set_context("paper", font_scale=1.5)
 sns.set_style("whitegrid")
 
 
+def _plot_best_model(best_model_path, metric_re):
+    """
+    Creates the train/val metric plots of one best model. Defined at module
+    level so that it can be dispatched to worker processes, the tfevents files
+    are re-read in the worker which is cheaper than pickling the dataframes.
+    """
+    tf_events_files = ModelAnalysis._get_tf_events_files(best_model_path)
+    for tfevent in tf_events_files:
+        train_df, val_df = ModelAnalysis._extract_train_val(
+            str(tfevent),
+            exclude="epoch",
+        )
+        train_metrics_df = _select_metric_columns(train_df, metric_re)
+        val_metrics_df = _select_metric_columns(val_df, metric_re)
+
+        ModelPlotter._plot_train_val_curve(
+            train_metrics_df,
+            val_metrics_df,
+            save_dir=best_model_path,
+        )
+
+
 class ModelPlotter(ModelSelection):
     def __init__(
         self,
@@ -29,11 +54,17 @@ class ModelPlotter(ModelSelection):
         )
         self.link_best_models()
 
-    def _plot_train_val_curve(
-        self, train_metrics_df, val_metrics_df, save_dir
-    ):
+    @staticmethod
+    def _plot_train_val_curve(train_metrics_df, val_metrics_df, save_dir):
         """Plot the training and validation curves for each metric."""
 
+        # Reuse one figure for all metrics instead of creating one per plot.
+        # The figure is not registered with pyplot, so no GUI backend is
+        # needed in the worker processes and the caller's backend is left
+        # untouched.
+        fig = Figure(figsize=(5, 3))
+        ax = fig.subplots()
+
         for train_metric in train_metrics_df.columns:
             metric = train_metric.split("_step")[0]
             metric = metric.split("train")[-1]
@@ -61,55 +92,47 @@ class ModelPlotter(ModelSelection):
                     0
                 ]  # Use the first matching validation metric
 
-                plt.figure(figsize=(5, 3))
-                plt.plot(
+                ax.clear()
+                ax.plot(
                     train_metrics_df.index,
                     train_metrics_df[train_metric],
                     label=f"Train {metric.capitalize()}",
                 )
-                plt.plot(
+                ax.plot(
                     val_metrics_df.index,
                     val_metrics_df[val_metric],
                     label=f"Val {metric.capitalize()}",
                 )
-                plt.xlabel("Step")
-                plt.ylabel(metric.capitalize())
-                plt.legend()
-                plt.grid(True)
-                plt.tight_layout()
+                ax.set_xlabel("Step")
+                ax.set_ylabel(metric.capitalize())
+                ax.legend()
+                ax.grid(True)
+                fig.tight_layout()
 
                 # Save the plot
-                plt.savefig(save_dir / f"{metric}.pdf")
-                plt.close()
+                fig.savefig(save_dir / f"{metric}.pdf")
 
-    def create_metric_plots(self):
-        pbar = tqdm(self.best_models)
-        for data in pbar:
-            pbar.set_description(
-                f"Creating metric plots for best model in .../{data['log_dir_relative']}"  # noqa
-            )
-            path = data["log_dir"]
-            best_model_path = path / "best_model"
-            tf_events_files = self._get_tf_events_files(best_model_path)
-            for tfevent in tf_events_files:
-                train_df = self.extract_data_from_event_file(
-                    str(tfevent),
-                    split="train",
-                    exclude="epoch",
-                )
-                train_metrics_df = self._extract_metrics_from_dataframe(
-                    train_df
-                )
+    def _ensure_metric_plots(self):
+        """Creates the metric plots unless they were already created."""
+        if not getattr(self, "_plots_done", False):
+            self.create_metric_plots()
 
-                val_df = self.extract_data_from_event_file(
-                    str(tfevent),
-                    split="val",
-                    exclude="epoch",
+    def create_metric_plots(self):
+        # Rendering the plots is CPU bound and independent per best model
+        with ProcessPoolExecutor() as executor:
+            futures = [
+                executor.submit(
+                    _plot_best_model,
+                    data["log_dir"] / "best_model",
+                    self._metric_re,
                 )
-                val_metrics_df = self._extract_metrics_from_dataframe(val_df)
+                for data in self.best_models
+            ]
+            for future in tqdm(
+                as_completed(futures),
+                total=len(futures),
+                desc="Creating metric plots",
+            ):
+                future.result()
 
-                self._plot_train_val_curve(
-                    train_metrics_df,
-                    val_metrics_df,
-                    save_dir=best_model_path,
-                )
+        self._plots_done = True
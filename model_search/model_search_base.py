@@ -1,5 +1,104 @@
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
 from pathlib import Path
 
+# Classifies directory entries in a single match. The alternatives are tried
+# in order, so an entry containing 'tfevents' is always a tfevents file.
+# 'best_model' directories are not descended into, 'checkpoints' directories
+# only when they sit inside a version directory (see _scan_dir). Only the
+# exact name is matched, experiments like 'resume_from_checkpoint' are kept.
+_ENTRY_RE = re.compile(
+    r"(?P<tfevents>(?=.*tfevents))"
+    r"|(?P<optuna>optuna\.db$)"
+    r"|(?P<best_model>best_model$)"
+    r"|(?P<checkpoint>checkpoints$)"
+)
+
+
+def _scan_dir(path, log_dirs, databases):
+    """
+    Scans a single directory with os.scandir. Adds the .parent.parent of each
+    'tfevents' file to log_dirs and each 'optuna.db' file to databases and
+    returns the subdirectories to descend into, 'best_model' directories are
+    skipped.
+    """
+    subdirs = []
+    checkpoint_dirs = []
+    has_tfevents = False
+    try:
+        it = os.scandir(path)
+    except OSError:
+        return subdirs  # e.g. permission denied, rglob skipped these as well
+    with it:
+        for entry in it:
+            match = _ENTRY_RE.match(entry.name)
+            kind = match.lastgroup if match else None
+            # tfevents entries are files, no need to check the type
+            if kind == "tfevents":
+                log_dirs.add(Path(entry.path).parent.parent)
+                has_tfevents = True
+            elif kind == "optuna":
+                databases.add(Path(entry.path))
+            # DirEntry caches the file type, no extra stat() call needed
+            elif kind is None and entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+            elif kind == "checkpoint" and entry.is_dir(follow_symlinks=False):
+                checkpoint_dirs.append(entry.path)
+
+    # A 'checkpoints' directory next to a tfevents file belongs to a version
+    # directory and only holds model weights, so it is skipped. Elsewhere it
+    # may be a log root, e.g. Trainer(default_root_dir="checkpoints") writes
+    # to checkpoints/lightning_logs/version_0, and has to be scanned.
+    if not has_tfevents:
+        subdirs.extend(checkpoint_dirs)
+
+    return subdirs
+
+
+def _scan_subtree(root):
+    """
+    Walks the directory tree below root and returns the sets of log
+    directories and optuna databases found in it.
+    """
+    log_dirs = set()
+    databases = set()
+    stack = [root]
+    while stack:
+        stack.extend(_scan_dir(stack.pop(), log_dirs, databases))
+
+    return log_dirs, databases
+
+
+def _scan_tree(start_path):
+    """
+    Scans the subdirectories of start_path in parallel. The scan is bound by
+    readdir/stat syscalls which release the GIL, so threads overlap them.
+    """
+    log_dirs = set()
+    databases = set()
+    children = _scan_dir(start_path, log_dirs, databases)
+
+    if children:
+        with ThreadPoolExecutor(max_workers=min(32, len(children))) as ex:
+            for subtree_log_dirs, subtree_databases in ex.map(
+                _scan_subtree, children
+            ):
+                log_dirs |= subtree_log_dirs
+                databases |= subtree_databases
+
+    return log_dirs, databases
+
+
+def _scan_start_path(start_path):
+    """
+    Returns the sorted log directories and optuna databases below start_path
+    as lists of pathlib.Path objects.
+    """
+    log_dirs, databases = _scan_tree(Path(start_path))
+    return sorted(log_dirs), sorted(databases)
+
 
 class ModelSearchBase:
     """
@@ -9,32 +108,39 @@ class ModelSearchBase:
 
     def __init__(self, start_path: Path):
         self.start_path = start_path
-        self.log_dirs = self._get_log_dirs(start_path)
 
-    def _get_log_dirs(self, start_path):
+    @cached_property
+    def _scan(self):
         """
-        Recursively searches for 'tfevents' files in all subdirectories of
-        start_path.  Adds the .parent.parent of each found 'tfevents' file to a
-        list and returns it.
-
-        :param start_path: The directory path to start the search from
-        :return: A list of pathlib.Path objects pointing to the directories
-            containing the 'tfevents' files
+        Walks start_path once per instance, collecting both the log
+        directories and the optuna databases.
         """
-        log_dirs = set()
-        start_path = Path(start_path)
+        return _scan_start_path(self.start_path)
 
-        # Walk through all subdirectories and files
-        for path in start_path.rglob("*"):
-            if path.is_file() and "tfevents" in path.name:
-                log_dirs.add(path.parent.parent)
+    @cached_property
+    def log_dirs(self):
+        """
+        Recursively searches for 'tfevents' files in all subdirectories of
+        start_path. The .parent.parent of each found 'tfevents' file is a log
+        directory.
 
-        log_dirs = list(log_dirs)
-        log_dirs.sort()
+        :return: A sorted list of pathlib.Path objects pointing to the
+            directories containing the 'tfevents' files
+        """
+        log_dirs, _ = self._scan
+        return list(log_dirs)
 
-        return log_dirs
+    @property
+    def _optuna_db_path(self):
+        """
+        The optuna database found while scanning for the log directories or
+        None. Lets OptunaPlotter skip its own walk of start_path.
+        """
+        _, databases = self._scan
+        return databases[0] if databases else None
 
-    def _get_version_dirs(self, log_dir):
+    @staticmethod
+    def _get_version_dirs(log_dir):
         """
         Returns a list of pathlib.Path objects pointing to the version
         directories in the given log directory. The 'best_model' directory is
@@ -44,12 +150,10 @@ class ModelSearchBase:
         :return: A list of pathlib.Path objects pointing to the version
             directories
         """
-        version_dirs = []
-        for version_dir in log_dir.iterdir():
-            if version_dir.is_dir():
-                version_dirs.append(version_dir)
-
-        # if 'best_model' is already in the list, remove it
-        version_dirs = [d for d in version_dirs if not d.name == "best_model"]
-
-        return version_dirs
+        # Single pass, the type check is served from the DirEntry cache
+        with os.scandir(log_dir) as it:
+            return [
+                Path(entry.path)
+                for entry in it
+                if entry.name != "best_model" and entry.is_dir()
+            ]
@@ -1,30 +1,60 @@
+import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import cached_property
 from pathlib import Path
 
 import yaml
 from tqdm import tqdm
 
+from ._yaml_setup import SafeDumper, SafeLoader
 from .model_evaluation import ModelEvaluation
 
 
-def generic_unknown_tag_handler(loader, tag_suffix, node):
-    # Prepare a string representation of the node value
-    if isinstance(node, yaml.ScalarNode):
-        value = loader.construct_scalar(node)
-    elif isinstance(node, yaml.SequenceNode):
-        value = loader.construct_sequence(node)
-    elif isinstance(node, yaml.MappingNode):
-        value = loader.construct_mapping(node)
-    else:
-        value = None  # A default for unrecognized node types
-    # Return a string that includes the tag and the value
-    return f"!!{tag_suffix} {value}"
+def _load_hparams(yaml_file):
+    """Loads the hyperparameters of a model from its hparams.yaml file."""
+    if not yaml_file.exists():
+        return {}
 
+    with open(yaml_file) as f:
+        hparams = yaml.load(f, Loader=SafeLoader) or {}
 
-# Register the generic handler for all unknown tags
-yaml.add_multi_constructor(
-    "", generic_unknown_tag_handler, Loader=yaml.SafeLoader
-)
+    return hparams["hparams"] if "hparams" in hparams else hparams
+
+
+def _link_best_model(source_dir, symlink_path, metrics_file_name, metrics):
+    """
+    Points the best_model symlink to the version directory of the best model
+    and saves its metrics to a yaml file in it.
+    """
+    if symlink_path.is_symlink():
+        symlink_path.unlink()
+    symlink_path.symlink_to(source_dir, target_is_directory=True)
+
+    # save metrics to yaml file in symlink directory
+    with open(symlink_path / metrics_file_name, "w") as f:
+        yaml.dump(
+            metrics,
+            f,
+            Dumper=SafeDumper,
+            default_flow_style=False,
+            sort_keys=False,
+        )
+
+
+def _remove_checkpoint(path):
+    """
+    Removes a checkpoint directory. Errors do not abort the removal, they are
+    collected and returned together with the path so that they can be
+    reported once all checkpoints were processed.
+    """
+    errors = []
+
+    def onerror(func, failed_path, exc_info):
+        errors.append((failed_path, exc_info[1]))
+
+    shutil.rmtree(path, onerror=onerror)
+    return path, errors
 
 
 class ModelSelection(ModelEvaluation):
@@ -46,42 +76,48 @@ class ModelSelection(ModelEvaluation):
             priority_order,
         )
 
-        self.best_models = self._select_best_models()
+    @cached_property
+    def best_models(self):
+        """The best model of each log directory, selected on first access."""
+        return list(self.iter_best_models())
 
-    def _select_best_models(self):
-        best_models = []
+    def iter_best_models(self):
+        """
+        Yields the best model of each log directory one at a time. The
+        hyperparameters are not loaded here, see iter_hparams.
+        """
         for i in self.data:
             log_dir = i["log_dir"]
             sorted_metrics_df = i["sorted_metrics_df"]
 
-            if sorted_metrics_df.empty:
+            rows, cols = sorted_metrics_df.shape
+            if rows == 0 or cols == 0:
                 continue
             best_model_dict = sorted_metrics_df.iloc[0].to_dict()
 
-            # get hyperparameters from yaml file
-            yaml_file = log_dir / best_model_dict["version"] / "hparams.yaml"
-            if yaml_file.exists():
-                with open(yaml_file) as f:
-                    hparams = yaml.safe_load(f)
-            else:
-                hparams = {"hparams": {}}
-
-            best_models.append(
-                {
-                    "log_dir": log_dir,
-                    "log_dir_relative": log_dir.relative_to(self.start_path),
-                    "metrics": best_model_dict,
-                    "hparams": hparams["hparams"]
-                    if "hparams" in hparams
-                    else hparams,
-                }
-            )
-
-        return best_models
+            yield {
+                "log_dir": log_dir,
+                "log_dir_relative": log_dir.relative_to(self.start_path),
+                "metrics": best_model_dict,
+                "hparams_file": log_dir
+                / best_model_dict["version"]
+                / "hparams.yaml",
+            }
+
+    def iter_hparams(self):
+        """
+        Yields the hyperparameters of each best model, in the order of
+        best_models. The yaml files are only parsed when needed and are loaded
+        in a thread pool to overlap the file I/O.
+        """
+        yaml_files = [data["hparams_file"] for data in self.best_models]
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            yield from executor.map(_load_hparams, yaml_files)
 
     def remove_unused_checkpoints(self, no_confirm=False):
         """Removes the checkpoints of all models other than the best model.
         Might be useful to save space."""
+        checkpoints = []
         for model_data in self.best_models:
             if not no_confirm:
                 confirm = input(
@@ -97,29 +133,56 @@ class ModelSelection(ModelEvaluation):
             version_dirs.remove(log_dir / model_data["metrics"]["version"])
             version_dirs.sort()
             for version_dir in version_dirs:
-                checkpoints = version_dir.glob("*checkpoint*")
-                for checkpoint in checkpoints:
-                    if checkpoint.is_dir():
-                        print(f"Removing {checkpoint} ...")
-                        shutil.rmtree(checkpoint)
+                with os.scandir(version_dir) as it:
+                    for entry in it:
+                        if "checkpoint" in entry.name and entry.is_dir(
+                            follow_symlinks=False
+                        ):
+                            checkpoints.append(entry.path)
+
+        if not checkpoints:
+            return
+
+        # rmtree is dominated by unlink syscalls, which release the GIL, so
+        # the checkpoints are removed in a thread pool
+        with ThreadPoolExecutor(max_workers=min(32, len(checkpoints))) as ex:
+            results = list(
+                tqdm(
+                    ex.map(_remove_checkpoint, checkpoints),
+                    total=len(checkpoints),
+                    desc="Removing checkpoints",
+                )
+            )
+
+        for checkpoint, errors in results:
+            if not errors:
+                print(f"Removed {checkpoint}")
+            for failed_path, exc in errors:
+                print(f"Failed to remove {failed_path}: {exc}")
 
     def link_best_models(self):
-        pbar = tqdm(self.best_models)
-        for data in pbar:
-            pbar.set_description(
-                f"Linking best model in .../{data['log_dir_relative']}"
-            )
-            # create symlink to best model
+        # Collect the link targets first, the links and metric files of the
+        # different models are then written in a thread pool
+        links = []
+        for data in self.best_models:
             path = data["log_dir"]
             metrics = data["metrics"]
+            links.append(
+                (
+                    path / metrics["version"],
+                    path / "best_model",
+                    f"{self.split}_metrics.yaml",
+                    metrics,
+                )
+            )
 
-            source_dir = path / metrics["version"]
-            symlink_path = path / "best_model"
-
-            if symlink_path.is_symlink():
-                symlink_path.unlink()
-            symlink_path.symlink_to(source_dir, target_is_directory=True)
-
-            # save metrics to yaml file in symlink directory
-            with open(symlink_path / f"{self.split}_metrics.yaml", "w") as f:
-                yaml.dump(metrics, f)
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            futures = [
+                executor.submit(_link_best_model, *link) for link in links
+            ]
+            for future in tqdm(
+                as_completed(futures),
+                total=len(futures),
+                desc="Linking best models",
+            ):
+                future.result()
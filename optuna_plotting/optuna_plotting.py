@@ -1,6 +1,10 @@
+from pathlib import Path
+
 import matplotlib.pyplot as plt
+import numpy as np
 import optuna
 import seaborn as sns
+from matplotlib.figure import Figure
 
 sns.set_context("paper", font_scale=1.5)
 sns.set(style="whitegrid")
@@ -9,17 +13,50 @@ sns.set(style="whitegrid")
 class OptunaPlotter:
     def __init__(self, start_path):
         self.start_path = start_path
-        self._search_database()
         self.storage = self._search_database()
         self.study_names = self._get_study_names()
 
+        # Figure reused for all saved plots, created on first use
+        self._fig = None
+        self._ax = None
+
+    def _get_axes(self, save_path):
+        """
+        Returns a figure and empty axes to draw on. Plots that are saved share
+        one figure that is not registered with pyplot, shown plots get their
+        own pyplot figure since the window owns it once it is shown.
+        """
+        if save_path is None:
+            return plt.subplots(figsize=(5, 3))
+
+        if self._fig is None:
+            self._fig = Figure(figsize=(5, 3))
+            self._ax = self._fig.subplots()
+        else:
+            self._ax.clear()
+        return self._fig, self._ax
+
+    def _save_or_show(self, fig, save_path):
+        fig.tight_layout()
+
+        if save_path is not None:
+            fig.savefig(save_path)
+        else:
+            plt.show()
+
     def _search_database(self):
-        for path in self.start_path.rglob("optuna.db"):
-            return f"sqlite:///{path}"
-        if self.db_path is None:
+        # When combined with ModelSearchBase the database was already found
+        # while scanning for the log directories
+        if hasattr(self, "_optuna_db_path"):
+            db_path = self._optuna_db_path
+        else:
+            db_path = next(Path(self.start_path).rglob("optuna.db"), None)
+
+        if db_path is None:
             raise FileNotFoundError(
                 f"No optuna database found in {self.start_path}."
             )
+        return f"sqlite:///{db_path}"
 
     def _get_study_names(self):
         study_summaries = optuna.get_all_study_summaries(storage=self.storage)
@@ -49,17 +86,12 @@ class OptunaPlotter:
             param_importances, hparam_names
         )
 
-        plt.figure(figsize=(5, 3))
-        plt.bar(param_importances.keys(), param_importances.values())
-        plt.ylabel("Importance")
-        plt.xticks(rotation=30, ha="right")
-        plt.tight_layout()
+        fig, ax = self._get_axes(save_path)
+        ax.bar(param_importances.keys(), param_importances.values())
+        ax.set_ylabel("Importance")
+        plt.setp(ax.get_xticklabels(), rotation=30, ha="right")
 
-        if save_path is not None:
-            plt.savefig(save_path)
-            plt.close()
-        else:
-            plt.show()
+        self._save_or_show(fig, save_path)
 
     def plot_optimization_history(
         self,
@@ -67,27 +99,27 @@ class OptunaPlotter:
         save_path=None,
     ):
         study = optuna.load_study(study_name=study_name, storage=self.storage)
-        best_values = [
-            t.value if t.value is not None else float("inf")
-            for t in study.trials
-        ]
+        # study.trials deep-copies the trials from storage on every access
+        trials = study.trials
+        best_values = np.fromiter(
+            (t.value if t.value is not None else np.inf for t in trials),
+            dtype=np.float64,
+            count=len(trials),
+        )
 
+        # Running best value as a single O(n) prefix scan
         if "ec" in study_name:
-            best_values_so_far = [
-                max(best_values[: i + 1]) for i in range(len(best_values))
-            ]
+            best_values_so_far = np.maximum.accumulate(best_values)
         else:
-            best_values_so_far = [
-                min(best_values[: i + 1]) for i in range(len(best_values))
-            ]
+            best_values_so_far = np.minimum.accumulate(best_values)
 
         obj_val = (
             "Validation Accuracy" if "ec" in study_name else "Validation Loss"
         )  # noqa
 
         # Plot objective values as points
-        plt.figure(figsize=(5, 3))
-        plt.scatter(
+        fig, ax = self._get_axes(save_path)
+        ax.scatter(
             range(1, len(best_values) + 1),
             best_values,
             label=obj_val,
@@ -95,23 +127,18 @@ class OptunaPlotter:
         )
 
         # Plot the best value as a line
-        plt.plot(
+        ax.plot(
             range(1, len(best_values_so_far) + 1),
             best_values_so_far,
             label="Best Value",
             color="red",
         )
 
-        plt.xlabel("Trial")
-        plt.ylabel(obj_val)
-        plt.legend()
-        plt.tight_layout()
+        ax.set_xlabel("Trial")
+        ax.set_ylabel(obj_val)
+        ax.legend()
 
-        if save_path is not None:
-            plt.savefig(save_path)
-            plt.close()
-        else:
-            plt.show()
+        self._save_or_show(fig, save_path)
 
     def plot_parallel_coordinate(self, study_name, params, save_path=None):
         # TODO: might need some improvements
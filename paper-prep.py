@@ -1,4 +1,7 @@
+import hashlib
+import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import argparse
 import yaml
@@ -7,9 +10,48 @@ from tqdm import tqdm
 
 from latex import LatexTemplate
 from model_search import ModelPlotter
+from model_search._yaml_setup import SafeLoader
 from optuna_plotting import OptunaPlotter
 
 
+def _link_or_copy(src, dst):
+    """
+    Hardlinks src to dst if both are on the same filesystem and copies it
+    otherwise.
+    """
+    if dst.exists():
+        if os.path.samefile(src, dst):
+            return  # already linked by a previous run
+        dst.unlink()
+
+    if os.stat(src).st_dev == os.stat(dst.parent).st_dev:
+        try:
+            os.link(src, dst)
+            return
+        except OSError:
+            pass  # e.g. filesystems without hardlink support
+
+    shutil.copy(src, dst)
+
+
+def _write_if_changed(path, content):
+    """
+    Writes content to path unless the file already holds the same content.
+    Keeps the modification time of unchanged files so LaTeX builds don't
+    needlessly rebuild.
+    """
+    data = content.encode()
+    digest = hashlib.blake2b(data, digest_size=16).digest()
+    if (
+        path.exists()
+        and hashlib.blake2b(path.read_bytes(), digest_size=16).digest()
+        == digest
+    ):
+        return
+
+    path.write_bytes(data)
+
+
 class PaperPrep(ModelPlotter, LatexTemplate, OptunaPlotter):
     def __init__(
         self,
@@ -21,6 +63,7 @@ class PaperPrep(ModelPlotter, LatexTemplate, OptunaPlotter):
         priority_order: str = "maximize",
         language: str = "english",
         significant_digits: int = 3,
+        eager_plots: bool = False,
     ):
         ModelPlotter.__init__(
             self,
@@ -42,31 +85,50 @@ class PaperPrep(ModelPlotter, LatexTemplate, OptunaPlotter):
             print("No optuna database found.")
             self.study_names = []
 
-        self.create_metric_plots()
+        # The metric plots are otherwise created on first use by
+        # generate_dir or generate_latex
+        if eager_plots:
+            self._ensure_metric_plots()
 
     def generate_dir(self):
         """Create directory for paper and copy best models into it."""
         self.paper_path = self.start_path / "paper"
         self.paper_path.mkdir(exist_ok=True)
 
-        pbar = tqdm(self.best_models)
-        for model_data in pbar:
-            rel_path = model_data["log_dir_relative"]
-            pbar.set_description(f"Generating directory for .../{rel_path}")
-            best_model_dir = model_data["log_dir"] / "best_model"
+        # The metric plots are part of the copied files
+        self._ensure_metric_plots()
+
+        # Link or copy the files in a thread pool to overlap the file I/O
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            futures = []
+            pbar = tqdm(self.best_models)
+            for model_data in pbar:
+                rel_path = model_data["log_dir_relative"]
+                pbar.set_description(
+                    f"Generating directory for .../{rel_path}"
+                )
+                best_model_dir = model_data["log_dir"] / "best_model"
+
+                # Create directory
+                paper_model_dir = self.paper_path / "images" / rel_path
+                paper_model_dir.mkdir(exist_ok=True, parents=True)
 
-            # Create directory
-            paper_model_dir = self.paper_path / "images" / rel_path
-            paper_model_dir.mkdir(exist_ok=True, parents=True)
+                # Copy files
+                dir_content = [
+                    f
+                    for f in best_model_dir.iterdir()
+                    if not f.is_dir() and "tfevents" not in f.name
+                ]
+                for file in dir_content:
+                    futures.append(
+                        executor.submit(
+                            _link_or_copy, file, paper_model_dir / file.name
+                        )
+                    )
 
-            # Copy files
-            dir_content = [
-                f
-                for f in best_model_dir.iterdir()
-                if not f.is_dir() and "tfevents" not in f.name
-            ]
-            for file in dir_content:
-                shutil.copy(file, paper_model_dir)
+            # Raise any error of the workers
+            for future in futures:
+                future.result()
 
     def generate_latex(
         self,
@@ -81,24 +143,27 @@ class PaperPrep(ModelPlotter, LatexTemplate, OptunaPlotter):
         One file is written to each best model directory and one file with
         all best models is written to the paper directory.
         """
-        all_best_models_latex = ""
+        self._ensure_metric_plots()
+
+        # Collect the LaTeX of all best models and join it once at the end
+        all_best_models_latex = []
 
         pbar = tqdm(self.best_models)
-        for model_data in pbar:
+        for model_data, hparams in zip(pbar, self.iter_hparams()):
             pbar.set_description(
                 f"Generating LaTeX for .../{model_data['log_dir_relative']}"
             )
             best_model_dir = model_data["log_dir"] / "best_model"
             metrics = model_data["metrics"]
-            hparams = model_data["hparams"]
 
-            image_files = [
-                best_model_dir.parent / f.name
-                for f in best_model_dir.glob("*.pdf")
-            ]
-            image_files = sorted(image_files, key=lambda x: x.name)
-            image_files = [f.relative_to(self.start_path) for f in image_files]
-            # remove "best_model" directory from path
+            # Image paths relative to start_path, without the "best_model"
+            # directory. best_model_dir.parent is the log dir, so the already
+            # known relative log dir can be used as prefix.
+            rel_log_dir = model_data["log_dir_relative"]
+            image_files = sorted(
+                (rel_log_dir / f.name for f in best_model_dir.glob("*.pdf")),
+                key=lambda x: x.name,
+            )
 
             # Generate LaTeX
             latex_output = self.fill_latex_template(
@@ -112,17 +177,15 @@ class PaperPrep(ModelPlotter, LatexTemplate, OptunaPlotter):
             )
 
             # Add LaTeX to all best models LaTeX
-            all_best_models_latex += latex_output
+            all_best_models_latex.append(latex_output)
 
             # Write LaTeX to file in best model directory
-            with open(best_model_dir / "latex.tex", "w") as f:
-                f.write(latex_output)
+            _write_if_changed(best_model_dir / "latex.tex", latex_output)
 
         # Write LaTeX to file in paper directory
         latex_path = self.start_path / "paper" / "chapter" / "ch_results.tex"
         latex_path.parent.mkdir(exist_ok=True, parents=True)
-        with open(latex_path, "w") as f:
-            f.write(all_best_models_latex)
+        _write_if_changed(latex_path, "".join(all_best_models_latex))
 
     def generate_optuna_plots(self, hparam_names={}):
         """Generate plots for each study."""
@@ -132,17 +195,33 @@ class PaperPrep(ModelPlotter, LatexTemplate, OptunaPlotter):
             print("No optuna studies found. Unable to generate plots.")
             # return
 
+        # Index the best models by their relative log dir. Study names are
+        # usually the name of the log dir, which can be looked up directly.
+        models_by_rel_path = {
+            str(model_data["log_dir_relative"]): model_data
+            for model_data in self.best_models
+        }
+        models_by_name = {}
+        for model_data in self.best_models:
+            models_by_name.setdefault(
+                model_data["log_dir_relative"].name, model_data
+            )
+
         pbar = tqdm(self.study_names)
         for study_name in pbar:
             # check if study_name is in best_models
-            model_data = [
-                model_data
-                for model_data in self.best_models
-                if study_name in str(model_data["log_dir_relative"])
-            ]
-            if not model_data:
+            model_data = models_by_name.get(study_name)
+            if model_data is None:
+                model_data = next(
+                    (
+                        model_data
+                        for rel_path, model_data in models_by_rel_path.items()
+                        if study_name in rel_path
+                    ),
+                    None,
+                )
+            if model_data is None:
                 continue
-            model_data = model_data[0]
             pbar.set_description(f"Generating plots for study {study_name}")
 
             self.plot_param_importance(
@@ -164,7 +243,7 @@ class PaperPrep(ModelPlotter, LatexTemplate, OptunaPlotter):
 if __name__ == "__main__":
     """Example usage. Replace artifacts_dir with your own directory."""
     with open("config.yaml", "r") as f:
-        config = yaml.safe_load(f)
+        config = yaml.load(f, Loader=SafeLoader)
     metric_names = config["metric_names"]
     hparam_names = config["hparam_names"]
     priority_min = config["priority_min"]
@@ -221,6 +300,8 @@ if __name__ == "__main__":
         custom_metrics=custom_metrics,
         language=args.language,
         significant_digits=args.significant_digits,
+        # LaTeX is always generated below, which needs the metric plots
+        eager_plots=True,
     )
 
     pp.generate_optuna_plots(hparam_names=hparam_names)